@@ -1,12 +1,53 @@
 from __future__ import annotations
+import html
 import json
+import os
+import re
 import sys
 from typing import Dict, Any, List, Tuple
-import hashlib
+from functools import lru_cache
+import zlib
 
 from pyvis.network import Network
 import networkx as nx
 
+# orjson is optional: it is much faster for the large payloads written into the
+# HTML page, but the standard library json module works as a fallback. Both paths
+# write non-ASCII text as raw UTF-8 rather than \u escapes, so the page relies on
+# the <meta charset="utf-8"> declaration in _HTML_TEMPLATE.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize obj to compact JSON with the json module."""
+    text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates cannot be written out as UTF-8, so escape them instead
+        return json.dumps(obj, separators=(",", ":"))
+    return text
+
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        """Serialize obj to compact JSON."""
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # orjson rejects lone surrogates and integers wider than 64 bits
+            return _json_dumps(obj)
+
+else:
+    _loads = json.loads
+    _dumps = _json_dumps
+
+
 # ────────────────────────────────────────────────────────────────
 # Configurable appearance
 # ────────────────────────────────────────────────────────────────
@@ -26,22 +67,51 @@ ROLE_SHAPES = {
     "start": "star",  # Star shape for start nodes
 }
 
+# Per-role (shape, colour, label header), precomputed so the traversals do a
+# single lookup per node. Unknown roles fall back to _DEFAULT_ROLE_STYLE and
+# build their header on the fly.
+_ROLE_STYLE = {
+    role: (shape, ROLE_COLOURS[role], f"<b>{role.upper()}</b>")
+    for role, shape in ROLE_SHAPES.items()
+}
+_DEFAULT_ROLE_STYLE = ("ellipse", "#CCCCCC", None)
+
 MAX_LABEL_CHARS = 40  # truncate long node values for readability
 
+# Interned role name; roles read from the JSON are interned as well, so the
+# equality checks against it hit CPython's identity fast path.
+_ROLE_FUNCTION_CALL = sys.intern("function_call")
+
+# Shared node font settings, one per possible text color. vis.js only reads
+# these, so every node can reference the same dict.
+_FONT_WHITE = {"size": 14, "color": "#FFFFFF"}
+_FONT_BLACK = {"size": 14, "color": "#000000"}
+
 
 # Function to generate a color based on name
+@lru_cache(maxsize=512)
 def get_color_for_name(name: str) -> str:
     """Generate a consistent color for a given name using hash."""
     if not name:
         return "#CCCCCC"  # Default color for unnamed nodes
 
-    # Use hash to generate consistent colors
-    hash_obj = hashlib.md5(name.encode())
-    hash_hex = hash_obj.hexdigest()
+    # Use a cheap, process-stable checksum to generate consistent colors
+    # (the built-in hash() is salted per process, and md5 is overkill here)
+    hash_value = zlib.crc32(name.encode()) & 0xFFFFFF
+
+    # Take the low 24 bits as RGB color
+    return f"#{hash_value:06x}"
+
+
+def _gamma_correct(byte: int) -> float:
+    c = byte / 255.0
+    if c <= 0.03928:
+        return c / 12.92
+    return pow((c + 0.055) / 1.055, 2.4)
+
 
-    # Take first 6 characters as RGB color
-    color = f"#{hash_hex[:6]}"
-    return color
+# Gamma-corrected value for every possible channel byte, computed once at import
+_GAMMA = tuple(_gamma_correct(byte) for byte in range(256))
 
 
 def calculate_luminance(hex_color: str) -> float:
@@ -49,26 +119,16 @@ def calculate_luminance(hex_color: str) -> float:
     # Remove # if present
     hex_color = hex_color.lstrip("#")
 
-    # Convert to RGB
-    r = int(hex_color[0:2], 16) / 255.0
-    g = int(hex_color[2:4], 16) / 255.0
-    b = int(hex_color[4:6], 16) / 255.0
-
-    # Apply gamma correction
-    def gamma_correct(c):
-        if c <= 0.03928:
-            return c / 12.92
-        else:
-            return pow((c + 0.055) / 1.055, 2.4)
-
-    r = gamma_correct(r)
-    g = gamma_correct(g)
-    b = gamma_correct(b)
+    # Convert to gamma-corrected RGB via the lookup table
+    r = _GAMMA[int(hex_color[0:2], 16)]
+    g = _GAMMA[int(hex_color[2:4], 16)]
+    b = _GAMMA[int(hex_color[4:6], 16)]
 
     # Calculate luminance using standard formula
     return 0.2126 * r + 0.7152 * g + 0.0722 * b
 
 
+@lru_cache(maxsize=512)
 def get_text_color_for_background(bg_color: str) -> str:
     """Get appropriate text color (black or white) for given background color."""
     luminance = calculate_luminance(bg_color)
@@ -76,349 +136,379 @@ def get_text_color_for_background(bg_color: str) -> str:
     return "#FFFFFF" if luminance < 0.5 else "#000000"
 
 
-# ──────────────────────────────────────────────────────────────────────────────
-# 1.  Load JSON (file or built-in sample)
-# ──────────────────────────────────────────────────────────────────────────────
-def load_graph_json(path: str | None = None) -> Dict[str, Any]:
-    if path:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+@lru_cache(maxsize=512)
+def get_name_styling(name: str) -> Tuple[str, str]:
+    """Get the (background color, text color) pair for a given name."""
+    color = get_color_for_name(name)
+    return color, get_text_color_for_background(color)
 
 
-def build_networkx(
+# ──────────────────────────────────────────────────────────────────────────────
+# 1.  Load JSON file
+# ──────────────────────────────────────────────────────────────────────────────
+def load_graph_json(path: str) -> Dict[str, Any]:
+    # Read raw bytes; both orjson and json decode UTF-8 themselves
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return _loads(data)
+    except json.JSONDecodeError:  # also raised by orjson
+        if orjson is None:
+            raise
+        # orjson rejects lone surrogate escapes (e.g. a string cut mid-emoji)
+        # that the json module accepts
+        return json.loads(data)
+
+
+@lru_cache(maxsize=1024)
+def _truncate(text: str) -> Tuple[str, bool]:
+    """Truncate text to MAX_LABEL_CHARS, returning the display string and whether it was cut."""
+    is_truncated = len(text) > MAX_LABEL_CHARS
+    return f"{text[:MAX_LABEL_CHARS]}{'…' if is_truncated else ''}", is_truncated
+
+
+@lru_cache(maxsize=1024)
+def _format_tool_args(raw_args: str) -> str:
+    """Normalize JSON tool args to compact form, falling back to the raw string."""
+    # Parse and format tool args nicely
+    # Use the json module here: orjson turns integers wider than 64 bits into floats
+    try:
+        parsed_args = json.loads(raw_args)
+    except json.JSONDecodeError:
+        # If parsing fails, just show the raw args
+        return raw_args
+    return json.dumps(parsed_args, separators=(",", ":"))
+
+
+def _format_label(
+    role: str,
+    tool_name: str,
+    tool_args: str,
+    name: str,
+    value: str,
+    has_subgraph: bool,
+) -> Tuple[str, bool]:
+    """Build a node label (role on top, then tool info, name and value) and report whether the value was truncated."""
+    # Format label with role on top, name (if present), and value below
+    truncated_value, is_truncated = _truncate(value)
+
+    # Build label with role, tool name and args (for function calls), name, and value
+    role_header = _ROLE_STYLE.get(role, _DEFAULT_ROLE_STYLE)[2]
+    label_parts = [role_header or f"<b>{role.upper()}</b>"]
+    if role == _ROLE_FUNCTION_CALL and tool_name:
+        label_parts.append(f"<b>Tool: {tool_name}</b>")
+    if role == _ROLE_FUNCTION_CALL and tool_args:
+        truncated_args, _ = _truncate(_format_tool_args(tool_args))
+        label_parts.append(f"<b>Args: {truncated_args}</b>")
+    if has_subgraph:
+        label_parts.append("<b>🔧 toolUse: yes</b>")
+    if name:
+        label_parts.append(f"<i>{name}</i>")
+    if truncated_value:
+        label_parts.append(truncated_value)
+
+    return "\n".join(label_parts), is_truncated
+
+
+def build_graph_data(
     root: Dict[str, Any],
-) -> Tuple[nx.DiGraph, Dict[str, Dict[str, Any]]]:
-    """Convert nested dict structure to a NetworkX DiGraph, separating function_call sub-graphs."""
-    G = nx.DiGraph()
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Convert nested dict structure to vis.js-ready node and edge lists, separating function_call sub-graphs."""
+    nodes_data = []
+    edges_data = []
     function_call_subgraphs = {}  # Store sub-graphs keyed by parent node ID
 
     # Add a special start node for the main graph
     start_node_id = "MAIN_START"
-    G.add_node(
-        start_node_id,
-        role="start",
-        label="",
-        name="main_start",
-        full_value="Entry point for the main conversation graph",
-        is_truncated=False,
-        has_subgraph=False,
+    start_node_name = "main_start"
+    start_color = "#FF1493"  # Deep pink for start nodes
+    nodes_data.append(
+        {
+            "id": start_node_id,
+            "label": "",
+            "color": start_color,
+            "shape": "star",  # Star shape for start nodes
+            "font": _FONT_WHITE,
+            "has_subgraph": False,
+            "name": start_node_name,
+            "full_value": "Entry point for the main conversation graph",
+            "is_truncated": False,
+            "clickable": False,
+            "role": "start",
+        }
     )
 
     def build_subgraph(
-        node: Dict[str, Any], parent: str | None = None, parent_name: str = ""
-    ) -> Tuple[List[Dict], List[Dict], Dict[str, Dict[str, Any]]]:
-        """Build a sub-graph from a function_call node, now supporting nested sub-graphs."""
-        nodes = []
-        edges = []
-        nested_subgraphs = {}  # Store nested sub-graphs
-
-        # Only add a special start node for this sub-graph if this is the root of a new sub-graph (parent is None)
-        subgraph_start_id = None
-        if parent is None:
-            subgraph_start_id = f"START_{node['nodeId']}"
-            start_node_config = {
-                "id": subgraph_start_id,
-                "label": "",
-                "color": "#FF1493",  # Deep pink for start nodes
-                "shape": "star",
-                "font": {"size": 14, "color": "#FFFFFF"},
-                "name": "subgraph_start",
-                "full_value": f"Entry point for sub-graph starting with {node['nodeId']}",
-                "is_truncated": False,
-                "has_subgraph": False,
-            }
-            nodes.append(start_node_config)
-
-        nid = node["nodeId"]
-        role = node.get("role", "unknown")
-        value = (
-            node.get("toolArgs", "")
-            if role == "function_call"
-            else node.get("value", "")
-        )
-        name = node.get("name", "")
-        tool_name = node.get("toolName", "")
-        tool_result = node.get("toolResult", "")
-
-        # Format label with role on top, name (if present), and value below
-        truncated_value = (
-            f"{value[:MAX_LABEL_CHARS]}{'…' if len(value) > MAX_LABEL_CHARS else ''}"
-        )
-
-        # Check if this node has function_call children
-        function_call_children = [
-            child
-            for child in node.get("pointingToNode", [])
-            if child.get("role") == "function_call"
-        ]
-        has_subgraph = len(function_call_children) > 0
-
-        # Build label with role, tool name (for function calls), name, and value
-        label_parts = [f"<b>{role.upper()}</b>"]
-        if role == "function_call" and tool_name:
-            label_parts.append(f"<b>Tool: {tool_name}</b>")
-        if has_subgraph:
-            label_parts.append("<b>🔧 toolUse: yes</b>")
-        if name:
-            label_parts.append(f"<i>{name}</i>")
-        if truncated_value:
-            label_parts.append(truncated_value)
-
-        label = "\n".join(label_parts)
-
-        # Check if content is truncated
-        is_truncated = len(value) > MAX_LABEL_CHARS
-
-        # Special styling for function_call nodes (similar to tool result nodes)
-        if role == "function_call":
-            # Use a distinct color for function calls
-            color = "#E67E22"  # Orange color for function calls
-            shape = "box"  # Use box shape like tool result nodes
-            text_color = get_text_color_for_background(color)
-        else:
-            color = get_color_for_name(name)
-            shape = ROLE_SHAPES.get(role, "ellipse")
-            text_color = get_text_color_for_background(color)
-
-        node_config = {
-            "id": nid,
-            "label": label,
-            "color": color,
-            "shape": shape,
-            "font": {"size": 14, "color": text_color},
-            "name": name,
-            "full_value": value,
-            "is_truncated": is_truncated,
-            "has_subgraph": has_subgraph,
-            "role": role,  # Add role so we can filter function_call nodes
+        root_node: Dict[str, Any],
+        parent_name: str,
+        subgraph_data: Dict[str, Any],
+    ) -> None:
+        """Append the sub-graph of a function_call node, now supporting nested sub-graphs, to subgraph_data."""
+        # Write straight into the shared output instead of building per-call lists
+        nodes = subgraph_data["nodes"]
+        edges = subgraph_data["edges"]
+        nested_subgraphs = subgraph_data["subgraphs"]  # Store nested sub-graphs
+        tool_calls = subgraph_data["toolCalls"]  # Indices of function_call nodes
+
+        # Add a special start node for this sub-graph
+        root_id = root_node["nodeId"]
+        subgraph_start_id = f"START_{root_id}"
+        start_node_config = {
+            "id": subgraph_start_id,
+            "label": "",
+            "color": "#FF1493",  # Deep pink for start nodes
+            "shape": "star",
+            "font": _FONT_WHITE,
+            "name": "subgraph_start",
+            "full_value": f"Entry point for sub-graph starting with {root_id}",
+            "is_truncated": False,
+            "has_subgraph": False,
+            "clickable": False,
         }
-
-        # Add tool-related properties for function_call nodes
-        if role == "function_call":
-            node_config["toolName"] = node.get("toolName", "")
-            node_config["toolArgs"] = node.get("toolArgs", "")
-            node_config["toolResult"] = node.get("toolResult", "")
-            node_config["toolCallIteration"] = node.get("toolCallIteration", 1)
-
-        # Add border for nodes with sub-graphs
-        if has_subgraph:
-            node_config["borderWidth"] = 3
-            node_config["borderColor"] = "#FF0000"
-
-        nodes.append(node_config)
-
-        # Connect start node to the first function_call node ONLY if we added a start node
-        if subgraph_start_id:
-            edges.append(
-                {"from": subgraph_start_id, "to": nid, "arrows": "to", "dashes": False}
-            )
-
-        if parent:
-            # Check if parent and child have same name for edge styling
-            edge_style = "solid" if parent_name == name else "dashes"
-            edges.append(
-                {
-                    "from": parent,
-                    "to": nid,
-                    "arrows": "to",
-                    "dashes": edge_style == "dashes",
-                }
+        nodes.append(start_node_config)
+
+        # Depth-first over the sub-graph with an explicit stack of (node, parent, parent_name)
+        stack = [(root_node, None, parent_name)]
+        while stack:
+            node, parent, parent_name = stack.pop()
+            node_get = node.get
+
+            nid = node["nodeId"]
+            role = sys.intern(node_get("role", "unknown"))
+            name = sys.intern(node_get("name", "") or "")
+            tool_name = node_get("toolName", "")
+            tool_args = node_get("toolArgs", "")
+            value = tool_args if role == _ROLE_FUNCTION_CALL else node_get("value", "")
+
+            # Process children - separate function_call from regular children
+            function_call_children = []
+            regular_children = []
+
+            for child in node_get("pointingToNode", ()):
+                if child.get("role") == _ROLE_FUNCTION_CALL:
+                    function_call_children.append(child)
+                else:
+                    regular_children.append(child)
+
+            has_subgraph = len(function_call_children) > 0
+
+            # Sub-graph labels show the raw tool args as the value, so no separate args line
+            label, is_truncated = _format_label(
+                role, tool_name, "", name, value, has_subgraph
             )
 
-        # Keep track of the last node in the chain to add tool result
-        last_node_id = nid
-
-        # Process children - separate function_call from regular children
-        regular_children = [
-            child
-            for child in node.get("pointingToNode", [])
-            if child.get("role") != "function_call"
-        ]
+            # Special styling for function_call nodes (similar to tool result nodes)
+            if role == _ROLE_FUNCTION_CALL:
+                # Use a distinct color for function calls
+                color = "#E67E22"  # Orange color for function calls
+                shape = "box"  # Use box shape like tool result nodes
+                text_color = get_text_color_for_background(color)
+            else:
+                color, text_color = get_name_styling(name)
+                shape = _ROLE_STYLE.get(role, _DEFAULT_ROLE_STYLE)[0]
+
+            node_config = {
+                "id": nid,
+                "label": label,
+                "color": color,
+                "shape": shape,
+                "font": _FONT_WHITE if text_color == "#FFFFFF" else _FONT_BLACK,
+                "name": name,
+                "full_value": value,
+                "is_truncated": is_truncated,
+                "has_subgraph": has_subgraph,
+                "clickable": has_subgraph or is_truncated,
+                "role": role,  # Add role so we can filter function_call nodes
+            }
 
-        # Add regular children to this sub-graph
-        for child in regular_children:
-            child_nodes, child_edges, child_nested_subgraphs = build_subgraph(
-                child, nid, name
-            )
-            nodes.extend(child_nodes)
-            edges.extend(child_edges)
-            # Merge nested subgraphs from children
-            nested_subgraphs.update(child_nested_subgraphs)
-            # Update last node to be the last child processed
-            if child_nodes:
-                last_node_id = child_nodes[-1]["id"]
-
-        # Handle function_call children as nested sub-graphs
-        if function_call_children:
-            subgraph_data = {"nodes": [], "edges": [], "subgraphs": {}}
+            # Add tool-related properties for function_call nodes
+            if role == _ROLE_FUNCTION_CALL:
+                node_config["toolName"] = tool_name
+                node_config["toolArgs"] = tool_args
+                node_config["toolResult"] = node_get("toolResult", "")
+                node_config["toolCallIteration"] = node_get("toolCallIteration", 1)
+                # Index the node is about to be appended at
+                tool_calls.append(len(nodes))
+
+            # Add border for nodes with sub-graphs
+            if has_subgraph:
+                node_config["borderWidth"] = 3
+                node_config["borderColor"] = "#FF0000"
+
+            nodes.append(node_config)
+
+            # Arrows come from the network's edge defaults, and solid is the vis.js
+            # default, so only dashed edges carry an extra key
+            if parent:
+                # Check if parent and child have same name for edge styling
+                edge_config = {"from": parent, "to": nid}
+                if parent_name != name:
+                    edge_config["dashes"] = True
+                edges.append(edge_config)
+            else:
+                # Connect start node to the first function_call node
+                edges.append({"from": subgraph_start_id, "to": nid})
 
-            for fc_child in function_call_children:
-                fc_nodes, fc_edges, fc_nested_subgraphs = build_subgraph(
-                    fc_child, None, name
-                )
-                subgraph_data["nodes"].extend(fc_nodes)
-                subgraph_data["edges"].extend(fc_edges)
-                subgraph_data["subgraphs"].update(fc_nested_subgraphs)
+            # Add regular children to this sub-graph, pushed in reverse so they pop in order
+            stack.extend((child, nid, name) for child in reversed(regular_children))
 
-            nested_subgraphs[nid] = subgraph_data
+            # Handle function_call children as nested sub-graphs (each has its own scope)
+            if function_call_children:
+                nested_subgraphs[nid] = build_fc_subgraph(function_call_children, name)
 
-        # Add tool result node if this is a function_call with toolResult
-        if role == "function_call" and tool_result:
-            result_node_id = f"{nid}_result"
+        # Add tool result node if the sub-graph root is a function_call with toolResult
+        tool_result = root_node.get("toolResult", "")
+        if root_node.get("role", "unknown") == _ROLE_FUNCTION_CALL and tool_result:
+            result_node_id = f"{root_id}_result"
 
             # Format tool result for display
-            truncated_result = f"{tool_result[:MAX_LABEL_CHARS]}{'…' if len(tool_result) > MAX_LABEL_CHARS else ''}"
+            truncated_result, result_is_truncated = _truncate(tool_result)
             result_label = f"<b>TOOL RESULT</b>\n{truncated_result}"
 
             # Use a different color for tool result nodes
             result_color = "#28A745"  # Green color for results
             result_text_color = get_text_color_for_background(result_color)
 
+            # The last node in the chain is the last one visited depth-first
+            last_node_id = nodes[-1]["id"]
+
             nodes.append(
                 {
                     "id": result_node_id,
                     "label": result_label,
                     "color": result_color,
                     "shape": "box",
-                    "font": {"size": 14, "color": result_text_color},
+                    "font": (
+                        _FONT_WHITE if result_text_color == "#FFFFFF" else _FONT_BLACK
+                    ),
                     "name": "tool_result",
                     "full_value": tool_result,
-                    "is_truncated": len(tool_result) > MAX_LABEL_CHARS,
+                    "is_truncated": result_is_truncated,
                     "has_subgraph": False,
+                    "clickable": result_is_truncated,
                 }
             )
 
             # Connect the last node in the chain to the result node
-            edges.append(
-                {
-                    "from": last_node_id,
-                    "to": result_node_id,
-                    "arrows": "to",
-                    "dashes": False,
-                }
-            )
+            edges.append({"from": last_node_id, "to": result_node_id})
+
+    def build_fc_subgraph(
+        function_call_children: List[Dict[str, Any]], parent_name: str
+    ) -> Dict[str, Any]:
+        """Combine the sub-graphs of a node's function_call children into one sub-graph."""
+        subgraph_data = {
+            "nodes": [],
+            "edges": [],
+            "subgraphs": {},  # Add nested subgraphs support
+            "toolCalls": [],  # Node indices of the tool usage table rows
+        }
 
-        return nodes, edges, nested_subgraphs
+        for fc_child in function_call_children:
+            # Build sub-graph from function_call node
+            build_subgraph(fc_child, parent_name, subgraph_data)
 
-    def walk(node: Dict[str, Any], parent: str | None = None):
-        nid = node["nodeId"]
-        role = node.get("role", "unknown")
-        value = node.get("value", "")
-        name = node.get("name", "")
-        tool_name = node.get("toolName", "")
-        tool_args = node.get("toolArgs", "")
-
-        # Format label with role on top, name (if present), and value below
-        truncated_value = (
-            f"{value[:MAX_LABEL_CHARS]}{'…' if len(value) > MAX_LABEL_CHARS else ''}"
-        )
+        return subgraph_data
 
-        # Build label with role, name, and value
-        label_parts = [f"<b>{role.upper()}</b>"]
-        if role == "function_call" and tool_name:
-            label_parts.append(f"<b>Tool: {tool_name}</b>")
-        if role == "function_call" and tool_args:
-            # Parse and format tool args nicely
-            try:
-                parsed_args = json.loads(tool_args)
-                args_str = json.dumps(parsed_args, indent=None, separators=(",", ":"))
-                truncated_args = f"{args_str[:MAX_LABEL_CHARS]}{'…' if len(args_str) > MAX_LABEL_CHARS else ''}"
-                label_parts.append(f"<b>Args: {truncated_args}</b>")
-            except json.JSONDecodeError:
-                # If parsing fails, just show the raw args (truncated)
-                truncated_args = f"{tool_args[:MAX_LABEL_CHARS]}{'…' if len(tool_args) > MAX_LABEL_CHARS else ''}"
-                label_parts.append(f"<b>Args: {truncated_args}</b>")
-        if name:
-            label_parts.append(f"<i>{name}</i>")
-        if truncated_value:
-            label_parts.append(truncated_value)
-
-        label = "\n".join(label_parts)
-
-        # Check if content is truncated
-        is_truncated = len(value) > MAX_LABEL_CHARS
+    # Start walking from the root, with the start node as parent. The main graph is
+    # traversed depth-first with an explicit stack of (node, parent, parent_name).
+    stack = [(root, start_node_id, start_node_name)]
+    while stack:
+        node, parent, parent_name = stack.pop()
+        node_get = node.get
 
-        # Add node to main graph with name information and full value
-        G.add_node(
-            nid,
-            role=role,
-            label=label,
-            name=name,
-            full_value=value,
-            is_truncated=is_truncated,
-        )
-        if parent:
-            G.add_edge(parent, nid)
+        nid = node["nodeId"]
+        role = sys.intern(node_get("role", "unknown"))
+        value = node_get("value", "")
+        name = sys.intern(node_get("name", "") or "")
+        tool_name = node_get("toolName", "")
+        tool_args = node_get("toolArgs", "")
 
         # Process children
         function_call_children = []
         regular_children = []
 
-        for child in node.get("pointingToNode", []):
-            if child.get("role") == "function_call":
+        for child in node_get("pointingToNode", ()):
+            if child.get("role") == _ROLE_FUNCTION_CALL:
                 function_call_children.append(child)
             else:
                 regular_children.append(child)
 
-        # Add regular children to main graph
-        for child in regular_children:
-            walk(child, nid)
+        has_subgraph = len(function_call_children) > 0
+        label, is_truncated = _format_label(
+            role, tool_name, tool_args, name, value, has_subgraph
+        )
+
+        # Use name-based color instead of role-based, but special styling for function_call and start nodes
+        if role == _ROLE_FUNCTION_CALL:
+            # Use a distinct color for function calls (same as in subgraphs)
+            color = "#E67E22"  # Orange color for function calls
+            shape = "box"  # Use box shape like tool result nodes
+            text_color = get_text_color_for_background(color)
+        elif role == "start":
+            # Use special styling for start nodes
+            color = "#FF1493"  # Deep pink for start nodes
+            shape = "star"  # Star shape for start nodes
+            text_color = get_text_color_for_background(color)
+        else:
+            color, text_color = get_name_styling(name)
+            shape = _ROLE_STYLE.get(role, _DEFAULT_ROLE_STYLE)[0]
+
+        # Add node to main graph with name information and full value
+        node_config = {
+            "id": nid,
+            "label": label,
+            "color": color,
+            "shape": shape,
+            "font": _FONT_WHITE if text_color == "#FFFFFF" else _FONT_BLACK,
+            "has_subgraph": has_subgraph,
+            "name": name,
+            "full_value": value,
+            "is_truncated": is_truncated,
+            "clickable": has_subgraph or is_truncated,
+            "role": role,
+        }
+
+        # Highlight nodes that have sub-graphs with a border
+        if has_subgraph:
+            node_config["borderWidth"] = 5  # Thicker border
+            node_config["borderColor"] = "#FF0000"
+            # Make the entire node slightly larger to draw attention
+            node_config["size"] = 30
+        elif is_truncated:
+            # Add a different border style for truncated content
+            node_config["borderWidth"] = 2
+            node_config["borderColor"] = "#FFA500"  # Orange border
+
+        nodes_data.append(node_config)
+
+        if parent:
+            # Use solid line for same name, dotted for different names
+            edge_config = {"from": parent, "to": nid}
+            if parent_name != name:
+                edge_config["dashes"] = True
+            edges_data.append(edge_config)
+
+        # Add regular children to main graph, pushed in reverse so they pop in order
+        stack.extend((child, nid, name) for child in reversed(regular_children))
 
         # Store function_call children as sub-graphs
         if function_call_children:
-            # Mark this node as having sub-graphs
-            G.nodes[nid]["has_subgraph"] = True
-
-            # Update the label to include toolUse indicator
-            updated_label_parts = [f"<b>{role.upper()}</b>"]
-            if role == "function_call" and tool_name:
-                updated_label_parts.append(f"<b>Tool: {tool_name}</b>")
-            if role == "function_call" and tool_args:
-                # Parse and format tool args nicely
-                try:
-                    parsed_args = json.loads(tool_args)
-                    args_str = json.dumps(
-                        parsed_args, indent=None, separators=(",", ":")
-                    )
-                    truncated_args = f"{args_str[:MAX_LABEL_CHARS]}{'…' if len(args_str) > MAX_LABEL_CHARS else ''}"
-                    updated_label_parts.append(f"<b>Args: {truncated_args}</b>")
-                except json.JSONDecodeError:
-                    # If parsing fails, just show the raw args (truncated)
-                    truncated_args = f"{tool_args[:MAX_LABEL_CHARS]}{'…' if len(tool_args) > MAX_LABEL_CHARS else ''}"
-                    updated_label_parts.append(f"<b>Args: {truncated_args}</b>")
-            updated_label_parts.append("<b>🔧 toolUse: yes</b>")
-            if name:
-                updated_label_parts.append(f"<i>{name}</i>")
-            if truncated_value:
-                updated_label_parts.append(truncated_value)
-
-            updated_label = "\n".join(updated_label_parts)
-            G.nodes[nid]["label"] = updated_label
-
-            # Create sub-graph for function_call children
-            subgraph_data = {
-                "nodes": [],
-                "edges": [],
-                "subgraphs": {},  # Add nested subgraphs support
-            }
+            function_call_subgraphs[nid] = build_fc_subgraph(
+                function_call_children, name
+            )
 
-            for fc_child in function_call_children:
-                # Build sub-graph from function_call node
-                subgraph_nodes, subgraph_edges, nested_subgraphs = build_subgraph(
-                    fc_child, None, name
-                )
-                subgraph_data["nodes"].extend(subgraph_nodes)
-                subgraph_data["edges"].extend(subgraph_edges)
-                # Merge nested subgraphs
-                subgraph_data["subgraphs"].update(nested_subgraphs)
-
-            function_call_subgraphs[nid] = subgraph_data
-        else:
-            # Mark this node as not having sub-graphs
-            G.nodes[nid]["has_subgraph"] = False
+    return nodes_data, edges_data, function_call_subgraphs
 
-    # Start walking from the root, with the start node as parent
-    walk(root, start_node_id)
+
+def build_networkx(
+    root: Dict[str, Any],
+) -> Tuple[nx.DiGraph, Dict[str, Dict[str, Any]]]:
+    """Convert nested dict structure to a NetworkX DiGraph, separating function_call sub-graphs."""
+    nodes_data, edges_data, function_call_subgraphs = build_graph_data(root)
+
+    G = nx.DiGraph()
+    G.add_nodes_from((node["id"], node) for node in nodes_data)
+    G.add_edges_from((edge["from"], edge["to"], edge) for edge in edges_data)
 
     return G, function_call_subgraphs
 
@@ -429,14 +519,15 @@ def to_pyvis(G: nx.DiGraph, out_html: str = "llm_graph.html") -> None:
 
     # Transfer nodes and edges with styling
     for node_id, data in G.nodes(data=True):
-        role = data.get("role", "unknown")
-        color = ROLE_COLOURS.get(role, "#CCCCCC")
+        shape, color, _ = _ROLE_STYLE.get(
+            data.get("role", "unknown"), _DEFAULT_ROLE_STYLE
+        )
         net.add_node(
             node_id,
             label=data["label"],
             title=data["label"],  # tooltip
             color=color,
-            shape=ROLE_SHAPES.get(role, "ellipse"),
+            shape=shape,
             font={"size": 14},
         )
 
@@ -453,108 +544,37 @@ def to_pyvis(G: nx.DiGraph, out_html: str = "llm_graph.html") -> None:
         print(f"PyVis template error: {e}")
         print("Trying alternative approach...")
         # Alternative: save the network data and create a simple HTML file
-        create_simple_html_graph(G, out_html)
-
-
-def create_simple_html_graph(
-    G: nx.DiGraph,
-    out_html: str = "llm_graph.html",
-    subgraphs: Dict[str, Dict[str, Any]] = None,
-) -> None:
-    """Create a simple HTML visualization using vis.js directly with sub-graph support."""
-
-    # Prepare nodes and edges data
-    nodes_data = []
-    edges_data = []
-
-    for node_id, data in G.nodes(data=True):
-        role = data.get("role", "unknown")
-        name = data.get("name", "")
-        full_value = data.get("full_value", "")
-        is_truncated = data.get("is_truncated", False)
-        has_subgraph = data.get("has_subgraph", False)
-
-        # Use name-based color instead of role-based, but special styling for function_call and start nodes
-        if role == "function_call":
-            # Use a distinct color for function calls (same as in subgraphs)
-            color = "#E67E22"  # Orange color for function calls
-            shape = "box"  # Use box shape like tool result nodes
-        elif role == "start":
-            # Use special styling for start nodes
-            color = "#FF1493"  # Deep pink for start nodes
-            shape = "star"  # Star shape for start nodes
-        else:
-            color = get_color_for_name(name)
-            shape = ROLE_SHAPES.get(role, "ellipse")
-
-        text_color = get_text_color_for_background(color)
-
-        # Create enhanced label with toolUse indicator if needed
-        original_label = data["label"]
-        if has_subgraph and "🔧 toolUse: yes" not in original_label:
-            # Split the original label and insert toolUse indicator after role
-            label_lines = original_label.split("\n")
-            enhanced_label_parts = [label_lines[0]]  # Role line
-            enhanced_label_parts.append("<b>🔧 toolUse: yes</b>")
-            enhanced_label_parts.extend(label_lines[1:])  # Rest of the label
-            enhanced_label = "\n".join(enhanced_label_parts)
-        else:
-            enhanced_label = original_label
-
-        # Highlight nodes that have sub-graphs with a border
-        node_config = {
-            "id": node_id,
-            "label": enhanced_label,
-            "color": color,
-            "shape": shape,
-            "font": {"size": 14, "align": "center", "color": text_color},
-            "has_subgraph": has_subgraph,
-            "name": name,
-            "full_value": full_value,
-            "is_truncated": is_truncated,
-        }
-
-        if has_subgraph:
-            node_config["borderWidth"] = 5  # Thicker border
-            node_config["borderColor"] = "#FF0000"
-            # Make the entire node slightly larger to draw attention
-            node_config["size"] = 30
-        elif is_truncated:
-            # Add a different border style for truncated content
-            node_config["borderWidth"] = 2
-            node_config["borderColor"] = "#FFA500"  # Orange border
-
-        nodes_data.append(node_config)
-
-    for src, dst in G.edges():
-        src_name = G.nodes[src].get("name", "")
-        dst_name = G.nodes[dst].get("name", "")
-
-        # Use solid line for same name, dotted for different names
-        edge_config = {"from": src, "to": dst, "arrows": "to"}
-
-        if src_name != dst_name:
-            edge_config["dashes"] = True
-
-        edges_data.append(edge_config)
+        create_simple_html_graph(
+            [data for _, data in G.nodes(data=True)],
+            [data for _, _, data in G.edges(data=True)],
+            out_html,
+        )
 
-    # Convert subgraphs to JSON for inclusion in HTML
-    subgraphs_json = json.dumps(subgraphs if subgraphs else {})
 
-    html_content = f"""
+# HTML page for the vis.js visualization. The graph data is spliced in at the
+# __NODES__, __EDGES__ and __SUBGRAPHS__ markers, so braces need no escaping.
+_HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
+    <meta charset="utf-8">
     <title>LLM Graph Visualization</title>
     <script type="text/javascript" src="https://unpkg.com/vis-network/standalone/umd/vis-network.min.js"></script>
     <style type="text/css">
-        #mynetworkid {{
+        #mynetworkid {
             width: 100%;
             height: 750px;
             border: 1px solid lightgray;
-        }}
-        #tooluse-table-modal {{
-            display: none;
+        }
+        .modal {
+            will-change: opacity, transform;
+            transform: translateZ(0);
+        }
+        #tooluse-table-modal {
+            visibility: hidden;
+            opacity: 0;
+            pointer-events: none;
+            transition: opacity .15s;
             position: fixed;
             z-index: 1001;
             left: 0;
@@ -562,8 +582,8 @@ def create_simple_html_graph(
             width: 100%;
             height: 100%;
             background-color: rgba(0,0,0,0.5);
-        }}
-        #tooluse-table-content {{
+        }
+        #tooluse-table-content {
             background-color: #fefefe;
             margin: 5% auto;
             padding: 20px;
@@ -572,57 +592,60 @@ def create_simple_html_graph(
             height: 80%;
             position: relative;
             overflow-y: auto;
-        }}
-        #tooluse-table {{
+        }
+        #tooluse-table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 20px;
-        }}
-        #tooluse-table th, #tooluse-table td {{
+        }
+        #tooluse-table th, #tooluse-table td {
             border: 1px solid #ddd;
             padding: 12px;
             text-align: left;
             vertical-align: top;
-        }}
-        #tooluse-table th {{
+        }
+        #tooluse-table th {
             background-color: #f2f2f2;
             font-weight: bold;
             position: sticky;
             top: 0;
-        }}
-        #tooluse-table tr:hover {{
+        }
+        #tooluse-table tr:hover {
             background-color: #f5f5f5;
             cursor: pointer;
-        }}
-        #tooluse-table tr.selected {{
+        }
+        #tooluse-table tr.selected {
             background-color: #e3f2fd;
-        }}
-        .tool-args {{
+        }
+        .tool-args {
             max-width: 300px;
             overflow: hidden;
             text-overflow: ellipsis;
             white-space: nowrap;
             font-family: monospace;
             font-size: 12px;
-        }}
-        .tool-result {{
+        }
+        .tool-result {
             max-width: 400px;
             overflow: hidden;
             text-overflow: ellipsis;
             white-space: nowrap;
             font-family: monospace;
             font-size: 12px;
-        }}
-        .iteration-badge {{
+        }
+        .iteration-badge {
             background-color: #007bff;
             color: white;
             padding: 2px 6px;
             border-radius: 12px;
             font-size: 11px;
             font-weight: bold;
-        }}
-        #subgraph-modal {{
-            display: none;
+        }
+        #subgraph-modal {
+            visibility: hidden;
+            opacity: 0;
+            pointer-events: none;
+            transition: opacity .15s;
             position: fixed;
             z-index: 1000;
             left: 0;
@@ -630,8 +653,8 @@ def create_simple_html_graph(
             width: 100%;
             height: 100%;
             background-color: rgba(0,0,0,0.5);
-        }}
-        #subgraph-content {{
+        }
+        #subgraph-content {
             background-color: #fefefe;
             margin: 5% auto;
             padding: 20px;
@@ -639,14 +662,19 @@ def create_simple_html_graph(
             width: 90%;
             height: 80%;
             position: relative;
-        }}
-        #subgraph-network {{
+        }
+        #subgraph-network {
             width: 100%;
             height: calc(100% - 50px);
             border: 1px solid lightgray;
-        }}
-        #fullcontent-modal {{
-            display: none;
+            will-change: transform;
+            contain: layout paint;
+        }
+        #fullcontent-modal {
+            visibility: hidden;
+            opacity: 0;
+            pointer-events: none;
+            transition: opacity .15s;
             position: fixed;
             z-index: 1002;
             left: 0;
@@ -654,8 +682,8 @@ def create_simple_html_graph(
             width: 100%;
             height: 100%;
             background-color: rgba(0,0,0,0.5);
-        }}
-        #fullcontent-content {{
+        }
+        #fullcontent-content {
             background-color: #fefefe;
             margin: 10% auto;
             padding: 20px;
@@ -664,8 +692,8 @@ def create_simple_html_graph(
             max-height: 70%;
             position: relative;
             overflow-y: auto;
-        }}
-        #fullcontent-text {{
+        }
+        #fullcontent-text {
             font-family: monospace;
             white-space: pre-wrap;
             word-wrap: break-word;
@@ -675,9 +703,12 @@ def create_simple_html_graph(
             border-radius: 4px;
             max-height: 400px;
             overflow-y: auto;
-        }}
-        #choice-modal {{
-            display: none;
+        }
+        #choice-modal {
+            visibility: hidden;
+            opacity: 0;
+            pointer-events: none;
+            transition: opacity .15s;
             position: fixed;
             z-index: 1003;
             left: 0;
@@ -685,8 +716,8 @@ def create_simple_html_graph(
             width: 100%;
             height: 100%;
             background-color: rgba(0,0,0,0.5);
-        }}
-        #choice-content {{
+        }
+        #choice-content {
             background-color: #fefefe;
             margin: 20% auto;
             padding: 30px;
@@ -695,8 +726,8 @@ def create_simple_html_graph(
             position: relative;
             text-align: center;
             border-radius: 8px;
-        }}
-        .choice-button {{
+        }
+        .choice-button {
             background-color: #0066CC;
             color: white;
             border: none;
@@ -705,49 +736,57 @@ def create_simple_html_graph(
             cursor: pointer;
             border-radius: 4px;
             font-size: 14px;
-        }}
-        .choice-button:hover {{
+        }
+        .choice-button:hover {
             background-color: #0052A3;
-        }}
-        .choice-button.secondary {{
+        }
+        .choice-button.secondary {
             background-color: #28A745;
-        }}
-        .choice-button.secondary:hover {{
+        }
+        .choice-button.secondary:hover {
             background-color: #218838;
-        }}
-        .close {{
+        }
+        #tooluse-table-modal.modal-open,
+        #subgraph-modal.modal-open,
+        #fullcontent-modal.modal-open,
+        #choice-modal.modal-open {
+            visibility: visible;
+            opacity: 1;
+            pointer-events: auto;
+        }
+        .close {
             color: #aaa;
             float: right;
             font-size: 28px;
             font-weight: bold;
             cursor: pointer;
-        }}
+        }
         .close:hover,
-        .close:focus {{
+        .close:focus {
             color: black;
             text-decoration: none;
-        }}
-        #instructions {{
+        }
+        #instructions {
             background-color: #f0f8ff;
             padding: 10px;
             margin: 10px 0;
             border-left: 4px solid #0066CC;
             font-size: 14px;
-        }}
-        #legend {{
+        }
+        #legend {
             background-color: #f9f9f9;
             padding: 10px;
             margin: 10px 0;
             border: 1px solid #ddd;
             font-size: 12px;
-        }}
-        #subgraph-breadcrumb {{
+        }
+        #subgraph-breadcrumb {
             background-color: #e9ecef;
             padding: 5px 10px;
             margin-bottom: 10px;
             border-radius: 4px;
             font-size: 12px;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -757,168 +796,284 @@ def create_simple_html_graph(
     <div id="mynetworkid"></div>
     
     <!-- Modal for tool use table -->
-    <div id="tooluse-table-modal">
-        <div id="tooluse-table-content">
-            <span class="close">&times;</span>
-            <h3 id="tooluse-table-title">Tool Usage List</h3>
-            <p>Click on a row to view the sub-graph for that specific tool call:</p>
-            <table id="tooluse-table">
-                <thead>
-                    <tr>
-                        <th>Iteration</th>
-                        <th>Tool Name</th>
-                        <th>Arguments</th>
-                        <th>Result</th>
-                    </tr>
-                </thead>
-                <tbody id="tooluse-table-body">
-                </tbody>
-            </table>
+    <template id="tooluse-table-modal-template">
+        <div id="tooluse-table-modal" class="modal">
+            <div id="tooluse-table-content">
+                <span class="close">&times;</span>
+                <h3 id="tooluse-table-title">Tool Usage List</h3>
+                <p>Click on a row to view the sub-graph for that specific tool call:</p>
+                <table id="tooluse-table">
+                    <thead>
+                        <tr>
+                            <th>Iteration</th>
+                            <th>Tool Name</th>
+                            <th>Arguments</th>
+                            <th>Result</th>
+                        </tr>
+                    </thead>
+                    <tbody id="tooluse-table-body">
+                    </tbody>
+                </table>
+            </div>
         </div>
-    </div>
+    </template>
     
     <!-- Modal for sub-graph display -->
-    <div id="subgraph-modal">
-        <div id="subgraph-content">
-            <span class="close">&times;</span>
-            <div id="subgraph-breadcrumb"></div>
-            <h3 id="subgraph-title">Function Call Sub-graph</h3>
-            <div id="subgraph-network"></div>
+    <template id="subgraph-modal-template">
+        <div id="subgraph-modal" class="modal">
+            <div id="subgraph-content">
+                <span class="close">&times;</span>
+                <div id="subgraph-breadcrumb"></div>
+                <h3 id="subgraph-title">Function Call Sub-graph</h3>
+                <div id="subgraph-network"></div>
+            </div>
         </div>
-    </div>
+    </template>
     
     <!-- Modal for full content display -->
-    <div id="fullcontent-modal">
-        <div id="fullcontent-content">
-            <span class="close">&times;</span>
-            <h3 id="fullcontent-title">Full Content</h3>
-            <div id="fullcontent-text"></div>
+    <template id="fullcontent-modal-template">
+        <div id="fullcontent-modal" class="modal">
+            <div id="fullcontent-content">
+                <span class="close">&times;</span>
+                <h3 id="fullcontent-title">Full Content</h3>
+                <div id="fullcontent-text"></div>
+            </div>
         </div>
-    </div>
+    </template>
 
     <!-- Modal for choice between subgraph and full content -->
-    <div id="choice-modal">
-        <div id="choice-content">
-            <span class="close">&times;</span>
-            <h3>What would you like to view?</h3>
-            <p>This node has both a sub-graph and truncated content.</p>
-            <button class="choice-button" onclick="choiceSubgraph()">View Tool Usage Table</button>
-            <button class="choice-button secondary" onclick="choiceFullContent()">View Full Content</button>
+    <template id="choice-modal-template">
+        <div id="choice-modal" class="modal">
+            <div id="choice-content">
+                <span class="close">&times;</span>
+                <h3>What would you like to view?</h3>
+                <p>This node has both a sub-graph and truncated content.</p>
+                <button class="choice-button" onclick="choiceSubgraph()">View Tool Usage Table</button>
+                <button class="choice-button secondary" onclick="choiceFullContent()">View Full Content</button>
+            </div>
         </div>
-    </div>
+    </template>
 
+    <!-- Sub-graph data, only parsed when a sub-graph is first opened -->
+__SUBGRAPH_DATA__
     <script type="text/javascript">
         // Main graph data
-        var nodes = new vis.DataSet({json.dumps(nodes_data)});
-        var edges = new vis.DataSet({json.dumps(edges_data)});
+        var nodes = new vis.DataSet(__NODES__);
+        var edges = new vis.DataSet(__EDGES__);
         var container = document.getElementById('mynetworkid');
-        var data = {{
+        var data = {
             nodes: nodes,
             edges: edges
-        }};
-        var options = {{
-            physics: {{
+        };
+        var options = {
+            physics: {
                 enabled: true,
                 solver: 'barnesHut',
-                barnesHut: {{
+                barnesHut: {
                     gravitationalConstant: -8000,
                     centralGravity: 0.1,
                     springLength: 200,
                     springConstant: 0.05,
                     damping: 0.09,
                     avoidOverlap: 1
-                }},
-                stabilization: {{
+                },
+                stabilization: {
                     iterations: 100,
                     onlyDynamicEdges: false,
                     fit: true
-                }}
-            }},
-            layout: {{
+                }
+            },
+            layout: {
                 improvedLayout: true,
                 randomSeed: 42  // Fixed seed for deterministic layout
-            }},
-            nodes: {{
-                font: {{
+            },
+            nodes: {
+                font: {
                     multi: 'html'
-                }}
-            }}
-        }};
+                }
+            },
+            edges: {
+                arrows: 'to'
+            }
+        };
         var network = new vis.Network(container, data, options);
         
+        // Id -> node index for the main graph click handler
+        var nodeIndex = Object.create(null);
+        nodes.forEach(function(node) {
+            nodeIndex[node.id] = node;
+        });
+        
         // Disable physics after stabilization to keep nodes static
-        network.once('stabilizationIterationsDone', function() {{
-            network.setOptions({{physics: {{enabled: false}}}});
-        }});
+        network.once('stabilizationIterationsDone', function() {
+            network.setOptions({physics: {enabled: false}});
+        });
         
-        // Sub-graph data
-        var subgraphs = {subgraphs_json};
+        // Ids of the top-level sub-graphs; their data is loaded on first use
+        var subgraphKeys = new Set(__SUBGRAPH_KEYS__);
+        var subgraphCache = {};
+        
+        // Load a top-level sub-graph, from its inline data block if the page has one
+        // (needed under file://) or else from its sibling JSON file
+        function getSubgraph(id, cb) {
+            if (subgraphCache[id]) return cb(subgraphCache[id]);
+            var inline = document.getElementById('subgraph-data-' + id);
+            if (inline) {
+                subgraphCache[id] = JSON.parse(inline.textContent);
+                return cb(subgraphCache[id]);
+            }
+            fetch('subgraph_' + encodeURIComponent(id) + '.json')
+                .then(function(response) { return response.json(); })
+                .then(function(subgraphData) {
+                    subgraphCache[id] = subgraphData;
+                    cb(subgraphData);
+                })
+                .catch(function(error) {
+                    console.error("Could not load sub-graph:", id, error);
+                });
+        }
         
         // Modal stack for navigation
         var modalStack = [];
         
-        // Modal elements
-        var toolTableModal = document.getElementById('tooluse-table-modal');
-        var subgraphModal = document.getElementById('subgraph-modal');
-        var fullcontentModal = document.getElementById('fullcontent-modal');
-        var choiceModal = document.getElementById('choice-modal');
-        var toolTableSpan = document.querySelector('#tooluse-table-modal .close');
-        var subgraphSpan = document.querySelector('#subgraph-modal .close');
-        var fullcontentSpan = document.querySelector('#fullcontent-modal .close');
-        var choiceSpan = document.querySelector('#choice-modal .close');
-        var subgraphContainer = document.getElementById('subgraph-network');
-        var subgraphTitle = document.getElementById('subgraph-title');
-        var subgraphBreadcrumb = document.getElementById('subgraph-breadcrumb');
-        var fullcontentTitle = document.getElementById('fullcontent-title');
-        var fullcontentText = document.getElementById('fullcontent-text');
-        var toolTableTitle = document.getElementById('tooluse-table-title');
-        var toolTableBody = document.getElementById('tooluse-table-body');
+        // Modal elements, mounted from their templates the first time each modal is shown
+        var toolTableModal = null;
+        var subgraphModal = null;
+        var fullcontentModal = null;
+        var choiceModal = null;
+        var subgraphContainer = null;
+        var subgraphTitle = null;
+        var subgraphBreadcrumb = null;
+        var fullcontentTitle = null;
+        var fullcontentText = null;
+        var toolTableTitle = null;
+        var toolTableBody = null;
+        
+        // Clone a modal out of its template on first use and wire up its close button
+        function ensureModal(id) {
+            var el = document.getElementById(id);
+            if (el) return el;
+            var tpl = document.getElementById(id + '-template');
+            el = tpl.content.firstElementChild.cloneNode(true);
+            document.body.appendChild(el);
+            el.querySelector('.close').onclick = function() {
+                popModal();
+            };
+            return el;
+        }
+        
+        function getToolTableModal() {
+            if (!toolTableModal) {
+                toolTableModal = ensureModal('tooluse-table-modal');
+                toolTableTitle = document.getElementById('tooluse-table-title');
+                toolTableBody = document.getElementById('tooluse-table-body');
+                
+                // Show the full text of an ellipsized cell on hover, set the first time it is hovered
+                toolTableBody.onmouseover = function(event) {
+                    var cell = event.target.closest('.tool-args, .tool-result');
+                    if (cell && !cell.title && cell.scrollWidth > cell.clientWidth) {
+                        cell.title = cell.textContent;
+                    }
+                };
+            }
+            return toolTableModal;
+        }
+        
+        function getSubgraphModal() {
+            if (!subgraphModal) {
+                subgraphModal = ensureModal('subgraph-modal');
+                subgraphContainer = document.getElementById('subgraph-network');
+                subgraphTitle = document.getElementById('subgraph-title');
+                subgraphBreadcrumb = document.getElementById('subgraph-breadcrumb');
+            }
+            return subgraphModal;
+        }
+        
+        function getFullcontentModal() {
+            if (!fullcontentModal) {
+                fullcontentModal = ensureModal('fullcontent-modal');
+                fullcontentTitle = document.getElementById('fullcontent-title');
+                fullcontentText = document.getElementById('fullcontent-text');
+            }
+            return fullcontentModal;
+        }
+        
+        function getChoiceModal() {
+            if (!choiceModal) {
+                choiceModal = ensureModal('choice-modal');
+            }
+            return choiceModal;
+        }
         
         // Variables to store choice modal context
         var choiceNodeId = null;
         var choiceNodeData = null;
         var choiceAvailableSubgraphs = null;
         
+        // Filtered sub-graph views, keyed by subgraph data and then by tool node id
+        var subgraphFilterCache = new WeakMap();
+        
+        // The vis network currently rendered in the sub-graph modal
+        var currentSubNetwork = null;
+        
+        function destroySubNetwork() {
+            if (currentSubNetwork) {
+                currentSubNetwork.destroy();
+                currentSubNetwork = null;
+            }
+        }
+        
+        // Call fn right away, then ignore further calls until ms have passed
+        function ignoreRepeats(fn, ms) {
+            var lastCall = -Infinity;
+            return function() {
+                var now = Date.now();
+                if (now - lastCall < ms) return;
+                lastCall = now;
+                return fn.apply(this, arguments);
+            };
+        }
+        
         // Modal stack management functions
-        function pushModal(modalInfo) {{
+        function pushModal(modalInfo) {
             modalStack.push(modalInfo);
             showCurrentModal();
             updateBreadcrumb();
-        }}
+        }
         
-        function popModal() {{
-            if (modalStack.length > 0) {{
+        function popModal() {
+            if (modalStack.length > 0) {
                 var currentModal = modalStack[modalStack.length - 1];
                 hideModal(currentModal.type);
                 modalStack.pop();
-            }}
+            }
             
-            if (modalStack.length > 0) {{
+            if (modalStack.length > 0) {
                 showCurrentModal();
-            }}
+            }
             updateBreadcrumb();
-        }}
+        }
         
-        function clearModalStack() {{
-            while (modalStack.length > 0) {{
+        function clearModalStack() {
+            while (modalStack.length > 0) {
                 var currentModal = modalStack[modalStack.length - 1];
                 hideModal(currentModal.type);
                 modalStack.pop();
-            }}
+            }
             updateBreadcrumb();
-        }}
+        }
         
-        function showCurrentModal() {{
+        function showCurrentModal() {
             if (modalStack.length === 0) return;
             
             var currentModal = modalStack[modalStack.length - 1];
             
             // For choice and fullContent modals, don't hide underlying modals - just show on top
-            if (currentModal.type !== 'choice' && currentModal.type !== 'fullContent') {{
+            if (currentModal.type !== 'choice' && currentModal.type !== 'fullContent') {
                 hideAllModals();
-            }}
+            }
             
-            switch (currentModal.type) {{
+            switch (currentModal.type) {
                 case 'toolTable':
                     showToolTableModal(currentModal.data);
                     break;
@@ -931,338 +1086,388 @@ def create_simple_html_graph(
                 case 'choice':
                     showChoiceModal(currentModal.data);
                     break;
-            }}
-        }}
+            }
+        }
         
-        function hideAllModals() {{
-            toolTableModal.style.display = "none";
-            subgraphModal.style.display = "none";
-            fullcontentModal.style.display = "none";
-            choiceModal.style.display = "none";
-        }}
+        function hideModalElement(modal) {
+            if (modal) modal.classList.remove('modal-open');
+        }
+        
+        function hideAllModals() {
+            hideModalElement(toolTableModal);
+            hideModalElement(subgraphModal);
+            hideModalElement(fullcontentModal);
+            hideModalElement(choiceModal);
+        }
         
-        function hideModal(modalType) {{
-            switch (modalType) {{
+        function hideModal(modalType) {
+            switch (modalType) {
                 case 'toolTable':
-                    toolTableModal.style.display = "none";
+                    hideModalElement(toolTableModal);
                     break;
                 case 'subgraph':
-                    subgraphModal.style.display = "none";
+                    hideModalElement(subgraphModal);
+                    destroySubNetwork();
                     break;
                 case 'fullContent':
-                    fullcontentModal.style.display = "none";
+                    hideModalElement(fullcontentModal);
                     break;
                 case 'choice':
-                    choiceModal.style.display = "none";
+                    hideModalElement(choiceModal);
                     break;
-            }}
-        }}
+            }
+        }
         
         // Handle main graph node clicks
-        network.on("click", function (params) {{
-            if (params.nodes.length > 0) {{
+        network.on("click", ignoreRepeats(function (params) {
+            if (params.nodes.length > 0) {
                 var nodeId = params.nodes[0];
-                var nodeData = nodes.get(nodeId);
-                handleNodeClick(nodeId, nodeData, subgraphs);
-            }}
-        }});
+                var nodeData = nodeIndex[nodeId];
+                if (!nodeData.clickable) return;
+                if (nodeData.has_subgraph && subgraphKeys.has(nodeId)) {
+                    getSubgraph(nodeId, function() {
+                        handleNodeClick(nodeId, nodeData, subgraphCache);
+                    });
+                } else {
+                    handleNodeClick(nodeId, nodeData, subgraphCache);
+                }
+            }
+        }, 100));
         
         // Generic function to handle node clicks
-        function handleNodeClick(nodeId, nodeData, availableSubgraphs) {{
+        function handleNodeClick(nodeId, nodeData, availableSubgraphs) {
             var hasSubgraph = nodeData.has_subgraph && availableSubgraphs[nodeId];
             var isTruncated = nodeData.is_truncated;
             
-            if (hasSubgraph && isTruncated) {{
+            if (hasSubgraph && isTruncated) {
                 // Push choice modal onto stack
-                pushModal({{
+                pushModal({
                     type: 'choice',
-                    data: {{
+                    data: {
                         nodeId: nodeId,
                         nodeData: nodeData,
                         availableSubgraphs: availableSubgraphs
-                    }}
-                }});
-            }} else if (hasSubgraph) {{
+                    }
+                });
+            } else if (hasSubgraph) {
                 // Push tool table modal onto stack
-                pushModal({{
+                pushModal({
                     type: 'toolTable',
-                    data: {{
+                    data: {
                         parentNodeId: nodeId,
                         subgraphData: availableSubgraphs[nodeId],
                         availableSubgraphs: availableSubgraphs
-                    }}
-                }});
-            }} else if (isTruncated) {{
+                    }
+                });
+            } else if (isTruncated) {
                 // Push full content modal onto stack
-                pushModal({{
+                pushModal({
                     type: 'fullContent',
-                    data: {{
+                    data: {
                         nodeId: nodeId,
                         nodeData: nodeData
-                    }}
-                }});
-            }}
-        }}
-        
-        // Function to extract tool call information from subgraph data
-        function extractToolCallsFromSubgraph(subgraphData) {{
-            var toolCalls = [];
-            
-            // Parse nodes to find function_call nodes with tool information
-            if (subgraphData.nodes) {{
-                for (var i = 0; i < subgraphData.nodes.length; i++) {{
-                    var node = subgraphData.nodes[i];
-                    var nodeId = node.id;
-                    
-                    // Only process function_call nodes
-                    if (node.role !== 'function_call') {{
-                        continue;
-                    }}
-                    
-                    // Extract tool information from the node data
-                    var toolName = node.toolName || 'Unknown Tool';
-                    var toolArgs = node.toolArgs || '';
-                    var toolResult = node.toolResult || '';
-                    var iteration = node.toolCallIteration || 1;
-                    
-                    // Add this tool call to our list
-                    toolCalls.push({{
-                        nodeId: nodeId,
-                        toolName: toolName,
-                        toolArgs: toolArgs,
-                        toolResult: toolResult,
-                        iteration: iteration,
-                        subgraphData: subgraphData
-                    }});
-                }}
-            }}
-            
-            return toolCalls;
-        }}
+                    }
+                });
+            }
+        }
         
         // Function to show tool table modal
-        function showToolTableModal(modalData) {{
+        function showToolTableModal(modalData) {
+            var modal = getToolTableModal();
             var parentNodeId = modalData.parentNodeId;
             var subgraphData = modalData.subgraphData;
             var availableSubgraphs = modalData.availableSubgraphs;
             
-            toolTableTitle.textContent = `Tool Usage for Node: ${{parentNodeId}}`;
+            toolTableTitle.textContent = `Tool Usage for Node: ${parentNodeId}`;
             
-            // Extract tool calls from subgraph data
-            var toolCalls = extractToolCallsFromSubgraph(subgraphData);
+            // Tool calls are the function_call nodes at the indices precomputed by the Python builder
+            var toolCallIndices = subgraphData.toolCalls || [];
+            var subgraphNodes = subgraphData.nodes;
             
             // Clear existing table rows
             toolTableBody.innerHTML = '';
             
+            // Single delegated click handler for all rows of this table
+            var selectedRow = null;
+            toolTableBody.onclick = function(event) {
+                var row = event.target.closest('tr[data-node-id]');
+                if (!row) return;
+                
+                // Move selection from the previously clicked row
+                if (selectedRow) selectedRow.classList.remove('selected');
+                row.classList.add('selected');
+                selectedRow = row;
+                
+                // Push specific tool subgraph modal onto stack
+                pushModal({
+                    type: 'subgraph',
+                    data: {
+                        toolNodeId: row.getAttribute('data-node-id'),
+                        subgraphData: subgraphData,
+                        availableSubgraphs: availableSubgraphs,
+                        parentNodeId: parentNodeId
+                    }
+                });
+            };
+            
+            // Build rows off-document and attach them in one insertion
+            var fragment = document.createDocumentFragment();
+            
             // Populate table with tool calls
-            for (var i = 0; i < toolCalls.length; i++) {{
-                var toolCall = toolCalls[i];
+            for (var i = 0, len = toolCallIndices.length; i < len; i++) {
+                var toolNode = subgraphNodes[toolCallIndices[i]];
+                var argsText = toolNode.toolArgs || 'N/A';
+                var resultText = toolNode.toolResult || 'N/A';
                 var row = document.createElement('tr');
-                row.setAttribute('data-node-id', toolCall.nodeId);
+                row.setAttribute('data-node-id', toolNode.id);
                 row.style.cursor = 'pointer';
                 
-                // Add click handler to the row
-                row.addEventListener('click', function(event) {{
-                    var clickedNodeId = event.currentTarget.getAttribute('data-node-id');
-                    
-                    // Remove selection from other rows
-                    var allRows = toolTableBody.querySelectorAll('tr');
-                    for (var j = 0; j < allRows.length; j++) {{
-                        allRows[j].classList.remove('selected');
-                    }}
-                    
-                    // Add selection to clicked row
-                    event.currentTarget.classList.add('selected');
-                    
-                    // Push specific tool subgraph modal onto stack
-                    pushModal({{
-                        type: 'subgraph',
-                        data: {{
-                            toolNodeId: clickedNodeId,
-                            subgraphData: subgraphData,
-                            availableSubgraphs: availableSubgraphs,
-                            parentNodeId: parentNodeId
-                        }}
-                    }});
-                }});
-                
                 // Create table cells
                 var iterationCell = document.createElement('td');
-                iterationCell.innerHTML = `<span class="iteration-badge">${{toolCall.iteration}}</span>`;
+                var iterationBadge = document.createElement('span');
+                iterationBadge.className = 'iteration-badge';
+                iterationBadge.textContent = toolNode.toolCallIteration || 1;
+                iterationCell.appendChild(iterationBadge);
                 
                 var toolNameCell = document.createElement('td');
-                toolNameCell.textContent = toolCall.toolName;
+                toolNameCell.textContent = toolNode.toolName || 'Unknown Tool';
                 toolNameCell.style.fontWeight = 'bold';
                 
                 var argsCell = document.createElement('td');
-                argsCell.textContent = toolCall.toolArgs || 'N/A';
+                argsCell.textContent = argsText;
                 argsCell.className = 'tool-args';
-                argsCell.title = toolCall.toolArgs || 'N/A'; // Show full text on hover
                 
                 var resultCell = document.createElement('td');
-                resultCell.textContent = toolCall.toolResult || 'N/A';
+                resultCell.textContent = resultText;
                 resultCell.className = 'tool-result';
-                resultCell.title = toolCall.toolResult || 'N/A'; // Show full text on hover
                 
                 row.appendChild(iterationCell);
                 row.appendChild(toolNameCell);
                 row.appendChild(argsCell);
                 row.appendChild(resultCell);
                 
-                toolTableBody.appendChild(row);
-            }}
+                fragment.appendChild(row);
+            }
             
-            toolTableModal.style.display = "block";
-        }}
+            toolTableBody.appendChild(fragment);
+            
+            // Only show the modal once the complete table is attached
+            modal.classList.add('modal-open');
+        }
         
         // Function to show subgraph modal
-        function showSubgraphModal(modalData) {{
+        function showSubgraphModal(modalData) {
+            var modal = getSubgraphModal();
             var toolNodeId = modalData.toolNodeId;
             var subgraphData = modalData.subgraphData;
             var availableSubgraphs = modalData.availableSubgraphs;
             var parentNodeId = modalData.parentNodeId;
             
+            // Tear down the previous sub-graph network before rendering a new one
+            destroySubNetwork();
+            
+            // Id -> node map, built once per subgraph and reused on later opens
+            var nodeById = subgraphData.__nodeById;
+            if (!nodeById) {
+                nodeById = Object.create(null);
+                var subgraphNodes = subgraphData.nodes;
+                for (var i = 0, len = subgraphNodes.length; i < len; i++) {
+                    var subgraphNode = subgraphNodes[i];
+                    nodeById[subgraphNode.id] = subgraphNode;
+                }
+                subgraphData.__nodeById = nodeById;
+            }
+            
             // Find the tool node to get its name for the title
-            var toolNode = subgraphData.nodes.find(function(n) {{ return n.id === toolNodeId; }});
-            if (!toolNode) {{
+            var toolNode = nodeById[toolNodeId];
+            if (!toolNode) {
                 console.error("Tool node not found:", toolNodeId);
                 return;
-            }}
+            }
             
             // Filter nodes and edges to show only the specific tool and its descendants
-            function findDescendants(nodeId, edges) {{
+            function findDescendants(nodeId, adjacency) {
                 var descendants = new Set([nodeId]);
                 var toVisit = [nodeId];
                 
-                while (toVisit.length > 0) {{
+                while (toVisit.length > 0) {
                     var currentId = toVisit.pop();
                     
-                    // Find all edges where this node is the source
-                    for (var i = 0; i < edges.length; i++) {{
-                        var edge = edges[i];
-                        if (edge.from === currentId && !descendants.has(edge.to)) {{
-                            descendants.add(edge.to);
-                            toVisit.push(edge.to);
-                        }}
-                    }}
-                }}
+                    // Visit all children of this node
+                    var children = adjacency[currentId];
+                    if (!children) continue;
+                    for (var i = 0, len = children.length; i < len; i++) {
+                        var childId = children[i];
+                        if (!descendants.has(childId)) {
+                            descendants.add(childId);
+                            toVisit.push(childId);
+                        }
+                    }
+                }
                 
-                return Array.from(descendants);
-            }}
-            
-            // Get all descendants of the tool node
-            var relevantNodeIds = findDescendants(toolNodeId, subgraphData.edges);
-            
-            // Filter nodes to only include the tool node and its descendants
-            var filteredNodes = subgraphData.nodes.filter(function(node) {{
-                return relevantNodeIds.includes(node.id);
-            }});
+                return descendants;
+            }
             
-            // Filter edges to only include connections between the filtered nodes
-            var filteredEdges = subgraphData.edges.filter(function(edge) {{
-                return relevantNodeIds.includes(edge.from) && relevantNodeIds.includes(edge.to);
-            }});
+            // Reuse the filtered view if this tool's sub-graph was opened before
+            var perData = subgraphFilterCache.get(subgraphData);
+            if (!perData) {
+                perData = {};
+                subgraphFilterCache.set(subgraphData, perData);
+            }
+            var cached = perData[toolNodeId];
+            if (!cached) {
+                // Parent -> children adjacency, built once per subgraph and reused on later opens
+                var adjacency = subgraphData.__adj;
+                if (!adjacency) {
+                    adjacency = Object.create(null);
+                    var subgraphEdges = subgraphData.edges;
+                    for (var i = 0, len = subgraphEdges.length; i < len; i++) {
+                        var edge = subgraphEdges[i];
+                        (adjacency[edge.from] || (adjacency[edge.from] = [])).push(edge.to);
+                    }
+                    subgraphData.__adj = adjacency;
+                }
+                
+                // Get all descendants of the tool node
+                var relevantNodeIds = findDescendants(toolNodeId, adjacency);
+                
+                cached = {
+                    // Filter nodes to only include the tool node and its descendants
+                    filteredNodes: subgraphData.nodes.filter(function(node) {
+                        return relevantNodeIds.has(node.id);
+                    }),
+                    // Filter edges to only include connections between the filtered nodes
+                    filteredEdges: subgraphData.edges.filter(function(edge) {
+                        return relevantNodeIds.has(edge.from) && relevantNodeIds.has(edge.to);
+                    }),
+                    // Filter subgraphs to only include those from the filtered nodes
+                    filteredSubgraphs: {}
+                };
+                if (subgraphData.subgraphs) {
+                    for (var nodeId in subgraphData.subgraphs) {
+                        if (relevantNodeIds.has(nodeId)) {
+                            cached.filteredSubgraphs[nodeId] = subgraphData.subgraphs[nodeId];
+                        }
+                    }
+                }
+                
+                // Id -> node index for the sub-graph click handler
+                cached.subNodeIndex = Object.create(null);
+                var filteredNodes = cached.filteredNodes;
+                for (var i = 0, len = filteredNodes.length; i < len; i++) {
+                    var filteredNode = filteredNodes[i];
+                    cached.subNodeIndex[filteredNode.id] = filteredNode;
+                }
+                
+                // DataSets are only read by the network, so later opens can share them
+                cached.subNodes = new vis.DataSet(cached.filteredNodes);
+                cached.subEdges = new vis.DataSet(cached.filteredEdges);
+                perData[toolNodeId] = cached;
+            }
+            var filteredSubgraphs = cached.filteredSubgraphs;
+            var subNodeIndex = cached.subNodeIndex;
             
-            // Filter subgraphs to only include those from the filtered nodes
-            var filteredSubgraphs = {{}};
-            if (subgraphData.subgraphs) {{
-                for (var nodeId in subgraphData.subgraphs) {{
-                    if (relevantNodeIds.includes(nodeId)) {{
-                        filteredSubgraphs[nodeId] = subgraphData.subgraphs[nodeId];
-                    }}
-                }}
-            }}
+            // Small tool-call traces settle quickly, so scale the layout work with node count
+            var nodeCount = cached.filteredNodes.length;
+            var stabilizationIterations = nodeCount < 10 ? 10 : (nodeCount < 50 ? 25 : 50);
             
             var toolName = toolNode.toolName || toolNode.name || toolNodeId;
-            subgraphTitle.textContent = `Tool Call Sub-graph: ${{toolName}}`;
-            
-            var subNodes = new vis.DataSet(filteredNodes);
-            var subEdges = new vis.DataSet(filteredEdges);
+            subgraphTitle.textContent = `Tool Call Sub-graph: ${toolName}`;
             
-            var subData = {{
-                nodes: subNodes,
-                edges: subEdges
-            }};
+            var subData = {
+                nodes: cached.subNodes,
+                edges: cached.subEdges
+            };
             
-            var subOptions = {{
-                physics: {{
+            var subOptions = {
+                physics: {
                     enabled: true,
                     solver: 'barnesHut',
-                    barnesHut: {{
+                    barnesHut: {
                         gravitationalConstant: -8000,
                         centralGravity: 0.1,
                         springLength: 200,
                         springConstant: 0.05,
                         damping: 0.09,
                         avoidOverlap: 1
-                    }},
-                    stabilization: {{
-                        iterations: 50,
+                    },
+                    stabilization: {
+                        iterations: stabilizationIterations,
                         onlyDynamicEdges: false,
                         fit: true
-                    }}
-                }},
-                layout: {{
-                    improvedLayout: true,
+                    }
+                },
+                layout: {
+                    improvedLayout: nodeCount > 30,
                     randomSeed: 42  // Fixed seed for deterministic layout
-                }},
-                nodes: {{
-                    font: {{
+                },
+                nodes: {
+                    font: {
                         multi: 'html'
-                    }}
-                }}
-            }};
+                    }
+                },
+                edges: {
+                    arrows: 'to'
+                }
+            };
             
             var subgraphNetwork = new vis.Network(subgraphContainer, subData, subOptions);
+            currentSubNetwork = subgraphNetwork;
             
             // Disable physics after stabilization to keep nodes static
-            subgraphNetwork.once('stabilizationIterationsDone', function() {{
-                subgraphNetwork.setOptions({{physics: {{enabled: false}}}});
-            }});
+            subgraphNetwork.once('stabilizationIterationsDone', function() {
+                subgraphNetwork.setOptions({physics: {enabled: false}});
+            });
             
             // Handle clicks within the sub-graph
-            subgraphNetwork.on("click", function (params) {{
-                if (params.nodes.length > 0) {{
+            subgraphNetwork.on("click", ignoreRepeats(function (params) {
+                if (params.nodes.length > 0) {
                     var subNodeId = params.nodes[0];
-                    var subNodeData = subNodes.get(subNodeId);
+                    var subNodeData = subNodeIndex[subNodeId];
+                    if (!subNodeData.clickable) return;
                     handleNodeClick(subNodeId, subNodeData, filteredSubgraphs);
-                }}
-            }});
+                }
+            }, 100));
             
-            subgraphModal.style.display = "block";
-        }}
+            modal.classList.add('modal-open');
+        }
         
         // Function to show full content modal
-        function showFullContentModal(modalData) {{
+        function showFullContentModal(modalData) {
+            var modal = getFullcontentModal();
             var nodeId = modalData.nodeId;
             var nodeData = modalData.nodeData;
             
-            fullcontentTitle.textContent = `Full Content for Node: ${{nodeId}} (${{nodeData.name || 'Unnamed'}})`;
+            fullcontentTitle.textContent = `Full Content for Node: ${nodeId} (${nodeData.name || 'Unnamed'})`;
             fullcontentText.textContent = nodeData.full_value;
-            fullcontentModal.style.display = "block";
-        }}
+            modal.classList.add('modal-open');
+        }
         
         // Function to show choice modal
-        function showChoiceModal(modalData) {{
+        function showChoiceModal(modalData) {
+            var modal = getChoiceModal();
             choiceNodeId = modalData.nodeId;
             choiceNodeData = modalData.nodeData;
             choiceAvailableSubgraphs = modalData.availableSubgraphs;
-            choiceModal.style.display = "block";
-        }}
+            modal.classList.add('modal-open');
+        }
         
         // Function to update breadcrumb trail
-        function updateBreadcrumb() {{
-            if (modalStack.length === 0) {{
+        function updateBreadcrumb() {
+            // Nothing to update until the sub-graph modal has been mounted
+            if (!subgraphBreadcrumb) return;
+            
+            if (modalStack.length === 0) {
                 subgraphBreadcrumb.style.display = "none";
                 return;
-            }}
+            }
             
             subgraphBreadcrumb.style.display = "block";
             var breadcrumbText = "Navigation Stack (depth " + modalStack.length + "): Main";
             
-            for (var i = 0; i < modalStack.length; i++) {{
+            for (var i = 0; i < modalStack.length; i++) {
                 var modal = modalStack[i];
-                switch (modal.type) {{
+                switch (modal.type) {
                     case 'toolTable':
                         breadcrumbText += " → Tool Table (" + modal.data.parentNodeId + ")";
                         break;
@@ -1276,92 +1481,120 @@ def create_simple_html_graph(
                     case 'choice':
                         breadcrumbText += " → Choice (" + modal.data.nodeId + ")";
                         break;
-                }}
-            }}
+                }
+            }
             
             var backButton = modalStack.length > 0 ? '<button onclick="goBack()" style="margin-left: 10px; font-size: 10px;">← Back</button>' : '';
             var closeAllButton = modalStack.length > 1 ? '<button onclick="closeAll()" style="margin-left: 5px; font-size: 10px;">✕ Close All</button>' : '';
             
             subgraphBreadcrumb.innerHTML = breadcrumbText + backButton + closeAllButton;
-        }}
+        }
         
         // Function to go back one level in the modal stack
-        function goBack() {{
+        function goBack() {
             popModal();
-        }}
+        }
         
         // Function to close all modals
-        function closeAll() {{
+        function closeAll() {
             clearModalStack();
-        }}
+        }
         
         // Functions to handle choice modal selections
-        function choiceSubgraph() {{
-            if (choiceNodeId && choiceAvailableSubgraphs && choiceAvailableSubgraphs[choiceNodeId]) {{
+        function choiceSubgraph() {
+            if (choiceNodeId && choiceAvailableSubgraphs && choiceAvailableSubgraphs[choiceNodeId]) {
                 // Hide choice modal first
-                choiceModal.style.display = "none";
+                choiceModal.classList.remove('modal-open');
                 
                 // Replace the choice modal with tool table modal
-                modalStack[modalStack.length - 1] = {{
+                modalStack[modalStack.length - 1] = {
                     type: 'toolTable',
-                    data: {{
+                    data: {
                         parentNodeId: choiceNodeId,
                         subgraphData: choiceAvailableSubgraphs[choiceNodeId],
                         availableSubgraphs: choiceAvailableSubgraphs
-                    }}
-                }};
+                    }
+                };
                 showCurrentModal();
-            }}
-        }}
+            }
+        }
         
-        function choiceFullContent() {{
-            if (choiceNodeId && choiceNodeData) {{
+        function choiceFullContent() {
+            if (choiceNodeId && choiceNodeData) {
                 // Hide choice modal first
-                choiceModal.style.display = "none";
+                choiceModal.classList.remove('modal-open');
                 
                 // Replace the choice modal with full content modal
-                modalStack[modalStack.length - 1] = {{
+                modalStack[modalStack.length - 1] = {
                     type: 'fullContent',
-                    data: {{
+                    data: {
                         nodeId: choiceNodeId,
                         nodeData: choiceNodeData
-                    }}
-                }};
+                    }
+                };
                 showCurrentModal();
-            }}
-        }}
-        
-        // Close modal handlers
-        toolTableSpan.onclick = function() {{
-            popModal();
-        }}
-        
-        subgraphSpan.onclick = function() {{
-            popModal();
-        }}
-        
-        fullcontentSpan.onclick = function() {{
-            popModal();
-        }}
-        
-        choiceSpan.onclick = function() {{
-            popModal();
-        }}
+            }
+        }
         
         // Close modal when clicking outside of it
-        window.onclick = function(event) {{
+        window.onclick = ignoreRepeats(function(event) {
             if (event.target == toolTableModal || 
                 event.target == subgraphModal || 
                 event.target == fullcontentModal || 
-                event.target == choiceModal) {{
+                event.target == choiceModal) {
                 popModal();
-            }}
-        }}
+            }
+        }, 50);
     </script>
 </body>
 </html>
 """
 
+_HTML_SENTINEL_RE = re.compile(r"__(NODES|EDGES|SUBGRAPH_KEYS|SUBGRAPH_DATA)__")
+
+
+def create_simple_html_graph(
+    nodes_data: List[Dict[str, Any]],
+    edges_data: List[Dict[str, Any]],
+    out_html: str = "llm_graph.html",
+    subgraphs: Dict[str, Dict[str, Any]] = None,
+    inline_subgraphs: bool = True,
+) -> None:
+    """Create a simple HTML visualization using vis.js directly with sub-graph support.
+
+    Top-level sub-graphs are embedded as JSON blocks that are only parsed on first
+    use. With inline_subgraphs=False they are instead written to sibling
+    subgraph_<id>.json files and fetched on first use, which keeps the page small
+    but requires serving it over HTTP, since pages opened from file:// cannot fetch.
+    """
+    subgraphs = subgraphs or {}
+
+    out_dir = os.path.dirname(out_html)
+    subgraph_blocks = []
+    for key, subgraph in subgraphs.items():
+        subgraph_json = _dumps(subgraph)
+        if inline_subgraphs:
+            subgraph_blocks.append(
+                f'    <script type="application/json" '
+                f'id="subgraph-data-{html.escape(key)}">{subgraph_json}</script>'
+            )
+        else:
+            with open(
+                os.path.join(out_dir, f"subgraph_{key}.json"), "w", encoding="utf-8"
+            ) as f:
+                f.write(subgraph_json)
+
+    payload = {
+        "NODES": _dumps(nodes_data),
+        "EDGES": _dumps(edges_data),
+        "SUBGRAPH_KEYS": _dumps(list(subgraphs)),
+        "SUBGRAPH_DATA": "\n".join(subgraph_blocks),
+    }
+    # Single pass so sentinel-like text inside the payload is never substituted
+    html_content = _HTML_SENTINEL_RE.sub(
+        lambda match: payload[match.group(1)], _HTML_TEMPLATE
+    )
+
     with open(out_html, "w", encoding="utf-8") as f:
         f.write(html_content)
 
@@ -1369,22 +1602,40 @@ def create_simple_html_graph(
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <filename>")
+    args = sys.argv[1:]
+    # Write sub-graphs to sibling JSON files instead of embedding them in the page
+    external_subgraphs = "--external-subgraphs" in args
+    if external_subgraphs:
+        args.remove("--external-subgraphs")
+    if len(args) < 1:
+        print("Usage: python main.py [--external-subgraphs] <filename>")
         sys.exit(1)
 
-    filename = sys.argv[1]
+    filename = args[0]
     data = load_graph_json(filename)
-    G, subgraphs = build_networkx(data)
+    nodes_data, edges_data, subgraphs = build_graph_data(data)
 
     # Use the enhanced HTML creation function
-    create_simple_html_graph(G, "llm_graph.html", subgraphs)
+    create_simple_html_graph(
+        nodes_data,
+        edges_data,
+        "llm_graph.html",
+        subgraphs,
+        inline_subgraphs=not external_subgraphs,
+    )
+
+    if external_subgraphs:
+        # Browsers block fetching the sub-graph files from file:// pages
+        print(
+            "Sub-graphs were written to subgraph_<id>.json files; serve this "
+            "directory over HTTP (e.g. python -m http.server) to view the graph"
+        )
+        return
 
     # Open the generated HTML file in the default browser
     # Try to open in browser but handle errors
     try:
         import webbrowser
-        import os
 
         html_path = os.path.abspath("llm_graph.html")
         if os.path.exists(html_path):